@@ -108,9 +108,11 @@ async def analyze_file_changes(
             ["git", "diff", "--name-status", f"{base_branch}...HEAD"],
             capture_output=True,
             text=True,
-            check=True,
             cwd=cwd
         )
+        # A missing base branch is a common mistake; report it without raising
+        if files_result.returncode != 0:
+            return json.dumps({"error": f"Git error: {files_result.stderr}"})
         
         # Get diff statistics
         stat_result = subprocess.run(
@@ -130,12 +132,17 @@ async def analyze_file_changes(
                 text=True,
                 cwd=cwd
             )
-            diff_lines = diff_result.stdout.split('\n')
+            diff_output = diff_result.stdout
             
-            # Check if we need to truncate
-            if len(diff_lines) > max_diff_lines:
-                diff_content = '\n'.join(diff_lines[:max_diff_lines])
-                diff_content += f"\n\n... Output truncated. Showing {max_diff_lines} of {len(diff_lines)} lines ..."
+            # Check if we need to truncate, slicing at the Nth newline rather than
+            # splitting the whole diff into a list of lines
+            total_diff_lines = diff_output.count('\n') + 1
+            if total_diff_lines > max_diff_lines:
+                cut = -1
+                for _ in range(max_diff_lines):
+                    cut = diff_output.find('\n', cut + 1)
+                diff_content = diff_output[:max(cut, 0)]
+                diff_content += f"\n\n... Output truncated. Showing {max_diff_lines} of {total_diff_lines} lines ..."
                 diff_content += "\n... Use max_diff_lines parameter to see more ..."
                 truncated = True
             else:
@@ -156,14 +163,12 @@ async def analyze_file_changes(
             "commits": commits_result.stdout,
             "diff": diff_content if include_diff else "Diff not included (set include_diff=true to see full diff)",
             "truncated": truncated,
-            "total_diff_lines": len(diff_lines) if include_diff else 0,
+            "total_diff_lines": total_diff_lines if include_diff else 0,
             "_debug": debug_info
         }
         
         return json.dumps(analysis, indent=2)
         
-    except subprocess.CalledProcessError as e:
-        return json.dumps({"error": f"Git error: {e.stderr}"})
     except Exception as e:
         return json.dumps({"error": str(e)})
 
@@ -197,7 +202,7 @@ async def suggest_template(changes_summary: str, change_type: str) -> str:
     templates = json.loads(templates_response)
     
     # Find matching template
-    template_file = TYPE_MAPPING.get(change_type.lower(), "feature.md")
+    template_file = TYPE_MAPPING.get(change_type.casefold(), "feature.md")
     selected_template = next(
         (t for t in templates if t["filename"] == template_file),
         templates[0]  # Default to first template if no match
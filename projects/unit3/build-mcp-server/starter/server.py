@@ -35,23 +35,59 @@ TEMPLATES_DIR = Path(__file__).parent.parent.parent / "templates"
 # TODO: Replace these with your actual implementations
 
 
+# The repository root and Repo object never change while the server runs
+_REPO_ROOT = None
+_REPO = None
+
+
+def _repo_root() -> str:
+    """Find the git repository root above the working directory (cached)."""
+    global _REPO_ROOT
+    if _REPO_ROOT is None:
+        repo_path = os.getcwd()
+        while repo_path != os.path.dirname(repo_path):
+            if os.path.exists(os.path.join(repo_path, '.git')):
+                break
+            repo_path = os.path.dirname(repo_path)
+        _REPO_ROOT = repo_path
+    return _REPO_ROOT
+
+
+def _get_repo() -> git.Repo:
+    """Get the GitPython Repo for the repository root (cached)."""
+    global _REPO
+    if _REPO is None:
+        _REPO = git.Repo(_repo_root())
+    return _REPO
+
+
 def _get_changed_files(base_branch: str, repo_path: str = None) -> list:
     """Get list of changed files."""
     try:
-        if repo_path is None:
-            repo_path = os.getcwd()
-            while repo_path != os.path.dirname(repo_path):
-                if os.path.exists(os.path.join(repo_path, '.git')):
-                    break
-                repo_path = os.path.dirname(repo_path)
-
-        repo = git.Repo(repo_path)
-        diff = repo.git.diff("--name-only", f"{base_branch}...HEAD")
-        return diff.strip().split("\n") if diff.strip() else []
+        repo = _get_repo() if repo_path is None else git.Repo(repo_path)
+        # NUL-separated bytes: no full decode, and odd filenames are not quoted
+        diff = repo.git.diff(
+            "-z", "--name-only", f"{base_branch}...HEAD", stdout_as_string=False
+        )
+        return [name.decode() for name in diff.split(b"\x00") if name]
     except Exception:
         return []
 
 
+def _truncate(text: str, max_lines: int) -> tuple:
+    """Keep the first max_lines lines of text without splitting it into a list.
+
+    Returns the kept prefix, the total number of lines and whether anything was cut.
+    """
+    idx = -1
+    for _ in range(max_lines):
+        nxt = text.find("\n", idx + 1)
+        if nxt == -1:
+            return text, text.count("\n") + 1, False
+        idx = nxt
+    return text[:max(idx, 0)], text.count("\n") + 1, True
+
+
 @mcp.tool()
 async def analyze_file_changes(
     base_branch: str = "main", include_diff: bool = True, max_diff_lines: int = 500
@@ -64,18 +100,11 @@ async def analyze_file_changes(
         max_diff_lines: Maximum diff lines to include (default 500)
     """
     try:
-        # Find git repo root
-        repo_path = os.getcwd()
-        while repo_path != os.path.dirname(repo_path):
-            if os.path.exists(os.path.join(repo_path, '.git')):
-                break
-            repo_path = os.path.dirname(repo_path)
-
         # Use GitPython
-        repo = git.Repo(repo_path)
+        repo = _get_repo()
 
         # Get changed files
-        files_changed = _get_changed_files(base_branch, repo_path)
+        files_changed = _get_changed_files(base_branch)
 
         # Get stats
         stats = repo.git.diff("--stat", f"{base_branch}...HEAD")
@@ -83,20 +112,18 @@ async def analyze_file_changes(
         if include_diff:
             # Get diff
             diff_output = repo.git.diff(f"{base_branch}...HEAD")
-            diff_lines = diff_output.split("\n")
 
             # Smart truncation
-            if len(diff_lines) > max_diff_lines:
-                truncated_diff = "\n".join(diff_lines[:max_diff_lines])
-                truncated_diff += f"\n\n... Output truncated. Showing {max_diff_lines} of {len(diff_lines)} lines ..."
-                diff_output = truncated_diff
+            diff_output, total_lines, truncated = _truncate(diff_output, max_diff_lines)
+            if truncated:
+                diff_output += f"\n\n... Output truncated. Showing {max_diff_lines} of {total_lines} lines ..."
         else:
             diff_output = "Use include_diff=true to see diff"
-            diff_lines = []
+            total_lines = 0
 
         return json.dumps({
             "stats": stats,
-            "total_lines": len(diff_lines) if include_diff else 0,
+            "total_lines": total_lines,
             "diff": diff_output,
             "files_changed": files_changed,
         })
@@ -1,16 +1,26 @@
 #!/usr/bin/env python3
 """
 Simple webhook server for GitHub Actions events.
-Stores events in a JSON file that the MCP server can read.
+Stores events in a JSON Lines file that the MCP server can read.
 """
 
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 from aiohttp import web
 
-# File to store events
-EVENTS_FILE = Path(__file__).parent / "github_events.json"
+# File to store events (JSON Lines, one event per line)
+EVENTS_FILE = Path(__file__).parent / "github_events.jsonl"
+MAX_EVENTS_FILE_BYTES = 1_000_000
+
+def compact_events():
+    """Rewrite the events file with only the last 100 events"""
+    lines = EVENTS_FILE.read_text().splitlines()[-100:]
+    tmp_file = EVENTS_FILE.with_suffix(".tmp")
+    tmp_file.write_text("".join(line + "\n" for line in lines))
+    # Atomic replace gives the file a new inode, so readers reload it from scratch
+    os.replace(tmp_file, EVENTS_FILE)
 
 async def handle_webhook(request):
     """Handle incoming GitHub webhook"""
@@ -28,19 +38,13 @@ async def handle_webhook(request):
             "sender": data.get("sender", {}).get("login")
         }
         
-        # Load existing events
-        events = []
-        if EVENTS_FILE.exists():
-            with open(EVENTS_FILE, 'r') as f:
-                events = json.load(f)
-        
-        # Add new event and keep last 100
-        events.append(event)
-        events = events[-100:]
+        # Append the event as one JSON line so readers only parse what is new
+        with open(EVENTS_FILE, 'a') as f:
+            f.write(json.dumps(event) + "\n")
         
-        # Save events
-        with open(EVENTS_FILE, 'w') as f:
-            json.dump(events, f, indent=2)
+        # Keep the log bounded: once it grows too large, keep the last 100 events
+        if EVENTS_FILE.stat().st_size > MAX_EVENTS_FILE_BYTES:
+            compact_events()
         
         return web.json_response({"status": "received"})
     except Exception as e:
@@ -4,17 +4,42 @@ Module 2: GitHub Actions Integration - STARTER CODE
 Extend your PR Agent with webhook handling and MCP Prompts for CI/CD workflows.
 """
 
+import asyncio
+import heapq
 import json
+import logging
 import os
-import subprocess
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from dataclasses import asdict, dataclass
 from typing import Optional
 from pathlib import Path
 from datetime import datetime
 
 from mcp.server.fastmcp import FastMCP
 
+# orjson is optional; it is much faster for large event histories
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    """Mirror the webhook events file in the background while the server runs."""
+    tail_task = asyncio.create_task(_tail_events())
+    try:
+        yield
+    finally:
+        tail_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await tail_task
+
+
 # Initialize the FastMCP server
-mcp = FastMCP("pr-agent-actions")
+mcp = FastMCP("pr-agent-actions", lifespan=_lifespan)
 
 # PR template directory (shared between starter and solution)
 TEMPLATES_DIR = Path(__file__).parent.parent.parent / "templates"
@@ -31,7 +56,8 @@ DEFAULT_TEMPLATES = {
 }
 
 # TODO: Add path to events file where webhook_server.py stores events
-EVENTS_FILE = Path(__file__).parent / "github_events.json"
+# (JSON Lines: one event object per line, appended as events arrive)
+EVENTS_FILE = Path(__file__).parent / "github_events.jsonl"
 
 # Type mapping for PR templates
 TYPE_MAPPING = {
@@ -50,9 +76,108 @@ TYPE_MAPPING = {
     "security": "security.md"
 }
 
+logger = logging.getLogger(__name__)
+
+
+def _dumps(obj) -> str:
+    """Serialize obj as indented JSON, using orjson when it is available."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def _loads(data: bytes):
+    """Parse JSON bytes, using orjson when it is available."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_templates() -> dict:
+    """Read every PR template once so the tools can serve them from memory."""
+    templates = {}
+    for filename, template_type in DEFAULT_TEMPLATES.items():
+        try:
+            content = (TEMPLATES_DIR / filename).read_text()
+        except OSError as e:
+            logger.warning("Could not read PR template %s: %s", filename, e)
+            content = ""
+        templates[filename] = {
+            "filename": filename,
+            "type": template_type,
+            "content": content
+        }
+    return templates
+
+
+# Templates never change while the server runs, so load and serialize them once
+_TEMPLATES_CACHE = _load_templates()
+
+
+def _templates_list() -> list:
+    """Return the cached templates in DEFAULT_TEMPLATES order."""
+    return list(_TEMPLATES_CACHE.values())
+
+
+_TEMPLATES_JSON = _dumps(_templates_list())
+
 
 # ===== Module 1 Tools (Already includes output limiting fix from Module 1) =====
 
+async def _git(*args: str) -> tuple:
+    """Run a git command without blocking the event loop.
+    
+    Returns (stdout, stderr, returncode). stdout is left as bytes so large
+    output is only decoded where it is actually used.
+    """
+    process = await asyncio.create_subprocess_exec(
+        "git", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    return stdout, stderr.decode(errors="replace"), process.returncode
+
+
+def _split_diff_output(output: bytes) -> tuple:
+    """Split `git diff --raw --stat --patch` output into its three sections.
+    
+    Returns the name-status listing, the diffstat and the offset in output
+    where the patch starts. The patch itself is not copied or decoded here.
+    """
+    patch_start = output.find(b"\ndiff --git ")
+    patch_start = len(output) if patch_start == -1 else patch_start + 1
+    header = output[:patch_start].decode(errors="replace")
+    
+    name_status = []
+    stat_lines = []
+    for line in header.splitlines():
+        if line.startswith(":"):
+            # ":100644 100644 abc1234 def5678 M\tpath" -> "M\tpath"
+            name_status.append(line.split(" ", 4)[-1])
+        elif line:
+            stat_lines.append(line)
+    
+    files_changed = "".join(f"{line}\n" for line in name_status)
+    statistics = "".join(f"{line}\n" for line in stat_lines)
+    return files_changed, statistics, patch_start
+
+
+def _truncate_bytes(buf: bytes, max_lines: int, start: int = 0) -> tuple:
+    """Keep the first max_lines lines of buf[start:], decoding only what is kept.
+    
+    Returns the kept text, the total number of lines and whether anything was cut.
+    """
+    total = buf.count(b"\n", start) + 1
+    idx = start - 1
+    for _ in range(max_lines):
+        nxt = buf.find(b"\n", idx + 1)
+        if nxt == -1:
+            return buf[start:].decode(errors="replace"), total, False
+        idx = nxt
+    return buf[start:max(idx, start)].decode(errors="replace"), total, True
+
+
 @mcp.tool()
 async def analyze_file_changes(
     base_branch: str = "main",
@@ -67,62 +192,55 @@ async def analyze_file_changes(
         max_diff_lines: Maximum number of diff lines to include (default: 500)
     """
     try:
-        # Get list of changed files
-        files_result = subprocess.run(
-            ["git", "diff", "--name-status", f"{base_branch}...HEAD"],
-            capture_output=True,
-            text=True,
-            check=True
+        # One git process produces the file list, the statistics and the patch;
+        # the commit log is independent, so both commands run concurrently
+        diff_args = ["diff", "--raw", "--stat"]
+        if include_diff:
+            diff_args.append("--patch")
+        diff_result, commits_result = await asyncio.gather(
+            _git(*diff_args, f"{base_branch}...HEAD"),
+            _git("log", "--oneline", f"{base_branch}..HEAD")
         )
         
-        # Get diff statistics
-        stat_result = subprocess.run(
-            ["git", "diff", "--stat", f"{base_branch}...HEAD"],
-            capture_output=True,
-            text=True
-        )
+        diff_stdout, diff_stderr, diff_returncode = diff_result
+        if diff_returncode != 0:
+            return json.dumps({"error": f"Git error: {diff_stderr}"})
+        files_changed, statistics, patch_start = _split_diff_output(diff_stdout)
         
         # Get the actual diff if requested
-        diff_content = ""
+        diff_content = "Diff not included (set include_diff=true to see full diff)"
+        total_diff_lines = 0
         truncated = False
         if include_diff:
-            diff_result = subprocess.run(
-                ["git", "diff", f"{base_branch}...HEAD"],
-                capture_output=True,
-                text=True
-            )
-            diff_lines = diff_result.stdout.split('\n')
-            
             # Check if we need to truncate (learned from Module 1)
-            if len(diff_lines) > max_diff_lines:
-                diff_content = '\n'.join(diff_lines[:max_diff_lines])
-                diff_content += f"\n\n... Output truncated. Showing {max_diff_lines} of {len(diff_lines)} lines ..."
-                diff_content += "\n... Use max_diff_lines parameter to see more ..."
-                truncated = True
-            else:
-                diff_content = diff_result.stdout
+            diff_content, total_diff_lines, truncated = _truncate_bytes(
+                diff_stdout, max_diff_lines, patch_start
+            )
+            if truncated:
+                # Append the notice in one step so the kept diff is copied only once
+                diff_content = "".join((
+                    diff_content,
+                    f"\n\n... Output truncated. Showing {max_diff_lines} of {total_diff_lines} lines ...",
+                    "\n... Use max_diff_lines parameter to see more ..."
+                ))
+        # Drop the raw output now; only the decoded, truncated diff is kept
+        del diff_result, diff_stdout
         
-        # Get commit messages for context
-        commits_result = subprocess.run(
-            ["git", "log", "--oneline", f"{base_branch}..HEAD"],
-            capture_output=True,
-            text=True
-        )
+        # Commit messages for context
+        commits = commits_result[0].decode(errors="replace")
         
         analysis = {
             "base_branch": base_branch,
-            "files_changed": files_result.stdout,
-            "statistics": stat_result.stdout,
-            "commits": commits_result.stdout,
-            "diff": diff_content if include_diff else "Diff not included (set include_diff=true to see full diff)",
+            "files_changed": files_changed,
+            "statistics": statistics,
+            "commits": commits,
+            "diff": diff_content,
             "truncated": truncated,
-            "total_diff_lines": len(diff_lines) if include_diff else 0
+            "total_diff_lines": total_diff_lines
         }
         
-        return json.dumps(analysis, indent=2)
+        return _dumps(analysis)
         
-    except subprocess.CalledProcessError as e:
-        return json.dumps({"error": f"Git error: {e.stderr}"})
     except Exception as e:
         return json.dumps({"error": str(e)})
 
@@ -130,16 +248,7 @@ async def analyze_file_changes(
 @mcp.tool()
 async def get_pr_templates() -> str:
     """List available PR templates with their content."""
-    templates = [
-        {
-            "filename": filename,
-            "type": template_type,
-            "content": (TEMPLATES_DIR / filename).read_text()
-        }
-        for filename, template_type in DEFAULT_TEMPLATES.items()
-    ]
-    
-    return json.dumps(templates, indent=2)
+    return _TEMPLATES_JSON
 
 
 @mcp.tool()
@@ -151,15 +260,11 @@ async def suggest_template(changes_summary: str, change_type: str) -> str:
         change_type: The type of change you've identified (bug, feature, docs, refactor, test, etc.)
     """
     
-    # Get available templates
-    templates_response = await get_pr_templates()
-    templates = json.loads(templates_response)
-    
     # Find matching template
-    template_file = TYPE_MAPPING.get(change_type.lower(), "feature.md")
-    selected_template = next(
-        (t for t in templates if t["filename"] == template_file),
-        templates[0]  # Default to first template if no match
+    template_file = TYPE_MAPPING.get(change_type.casefold(), "feature.md")
+    selected_template = (
+        _TEMPLATES_CACHE.get(template_file) or
+        next(iter(_TEMPLATES_CACHE.values()))  # Default to first template if no match
     )
     
     suggestion = {
@@ -169,11 +274,136 @@ async def suggest_template(changes_summary: str, change_type: str) -> str:
         "usage_hint": "Claude can help you fill out this template based on the specific changes in your PR."
     }
     
-    return json.dumps(suggestion, indent=2)
+    return _dumps(suggestion)
 
 
 # ===== Module 2: New GitHub Actions Tools =====
 
+# Parsed events and the derived workflow summary. The events file is an
+# append-only log, so on each change only the bytes after "offset" are parsed;
+# a new inode or a shrunken file means it was rewritten and is read from scratch.
+# The background _tail_events task keeps this warm, so tool calls usually
+# find nothing new to parse. Only the newest MAX_CACHED_EVENTS events are kept
+# in memory; "count" tracks how many the log holds in total.
+MAX_CACHED_EVENTS = 1000
+EVENTS_POLL_INTERVAL = 0.2
+
+_events_cache = {
+    "key": None, "inode": None, "offset": 0, "count": 0,
+    "events": deque(maxlen=MAX_CACHED_EVENTS), "workflows": {}, "workflows_lower": {}
+}
+_events_lock = asyncio.Lock()
+
+
+@dataclass(slots=True)
+class WFRow:
+    """Workflow fields extracted once from a raw webhook event."""
+    name: str
+    status: str
+    conclusion: str
+    last_update: str
+    run_id: Optional[int]
+    run_number: Optional[int]
+    event_name: Optional[str]
+    head_branch: Optional[str]
+
+
+def _to_wf_row(event: dict) -> Optional[WFRow]:
+    """Normalize a workflow event into a WFRow, or None if it is not one."""
+    # Keep workflow_run events and anything with workflow-related fields
+    if not (
+        event.get('event_type') == 'workflow_run' or 'workflow_run' in event or
+        any(key in event for key in ['workflow_name', 'workflow_id', 'status', 'conclusion'])
+    ):
+        return None
+
+    run = event.get('workflow_run') or {}
+    return WFRow(
+        name=event.get('workflow_name') or run.get('name') or event.get('name') or 'Unknown Workflow',
+        status=event.get('status') or run.get('status') or 'unknown',
+        conclusion=event.get('conclusion') or run.get('conclusion') or 'pending',
+        last_update=event.get('timestamp') or run.get('created_at') or event.get('created_at') or '',
+        run_id=run.get('id') or event.get('run_id'),
+        run_number=run.get('run_number') or event.get('run_number'),
+        event_name=run.get('event') or event.get('event_name'),
+        head_branch=run.get('head_branch') or event.get('head_branch')
+    )
+
+
+def _update_workflows(latest_by_name: dict, latest_by_name_lower: dict, events: list) -> None:
+    """Fold events into the indexes of the latest WFRow per workflow name.
+    
+    latest_by_name_lower is keyed by the lowercased name for case-insensitive lookups.
+    """
+    for event in events:
+        row = _to_wf_row(event) if isinstance(event, dict) else None
+        if row is None:
+            continue
+        current = latest_by_name.get(row.name)
+        if current is None or row.last_update > current.last_update:
+            latest_by_name[row.name] = row
+        current = latest_by_name_lower.get(row.name.lower())
+        if current is None or row.last_update > current.last_update:
+            latest_by_name_lower[row.name.lower()] = row
+
+
+async def _load_events() -> tuple:
+    """Return (events, total, workflows, workflows_lower) for EVENTS_FILE.
+    
+    events holds at most MAX_CACHED_EVENTS of the newest events, while total
+    counts every event in the file. Only lines appended since the previous
+    call are parsed, so writers must append to the file or replace it whole
+    (as compact_events() does); other in-place edits are only detected when
+    they move a line boundary.
+    """
+    async with _events_lock:
+        stat = EVENTS_FILE.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        if _events_cache["key"] != key:
+            with open(EVENTS_FILE, 'rb') as f:
+                offset = _events_cache["offset"]
+                if offset:
+                    f.seek(offset - 1)
+                # A new inode, a shorter file or a cached offset that no longer
+                # ends a line means the file was rewritten: read it from the start
+                if (stat.st_ino != _events_cache["inode"] or stat.st_size < offset
+                        or (offset and f.read(1) != b"\n")):
+                    _events_cache.update(
+                        inode=stat.st_ino, offset=0, count=0, events=deque(maxlen=MAX_CACHED_EVENTS),
+                        workflows={}, workflows_lower={}
+                    )
+                f.seek(_events_cache["offset"])
+                data = f.read()
+
+            # Only consume complete lines; a half-written event is read next time
+            end = data.rfind(b"\n") + 1
+            new_events = [_loads(line) for line in data[:end].splitlines() if line.strip()]
+
+            _events_cache["events"].extend(new_events)
+            _events_cache["count"] += len(new_events)
+            _update_workflows(
+                _events_cache["workflows"], _events_cache["workflows_lower"], new_events
+            )
+            _events_cache["offset"] += end
+            _events_cache["key"] = key
+        return (
+            _events_cache["events"], _events_cache["count"],
+            _events_cache["workflows"], _events_cache["workflows_lower"]
+        )
+
+
+async def _tail_events() -> None:
+    """Poll EVENTS_FILE and fold newly appended events into the in-memory mirror."""
+    while True:
+        try:
+            if EVENTS_FILE.exists():
+                await _load_events()
+        except Exception as e:
+            # The tools report read/parse errors; just retry on the next poll
+            logger.debug("Failed to refresh events: %s", e)
+        await asyncio.sleep(EVENTS_POLL_INTERVAL)
+
+
 @mcp.tool()
 async def get_recent_actions_events(limit: int = 10) -> str:
     """Get recent GitHub Actions events received via webhook.
@@ -189,22 +419,20 @@ async def get_recent_actions_events(limit: int = 10) -> str:
                 "message": "No events file found. Webhook server may not be running."
             })
 
-        # Read the JSON file
-        with open(EVENTS_FILE, 'r') as f:
-            all_events = json.load(f)
+        all_events, total_events, _, _ = await _load_events()
 
-        # Return the most recent events (up to limit)
-        recent_events = all_events[-limit:] if isinstance(all_events, list) else []
-
-        # Sort by timestamp if available (most recent first)
-        if recent_events and all(isinstance(e, dict) and 'timestamp' in e for e in recent_events):
-            recent_events.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        # Return the most recent events (up to limit), most recent first
+        recent_events = heapq.nlargest(
+            limit,
+            (e for e in all_events if isinstance(e, dict)),
+            key=lambda e: e.get('timestamp', '')
+        )
 
-        return json.dumps({
-            "total_events": len(all_events) if isinstance(all_events, list) else 0,
+        return _dumps({
+            "total_events": total_events,
             "returned_events": len(recent_events),
             "events": recent_events
-        }, indent=2)
+        })
 
     except json.JSONDecodeError as e:
         return json.dumps({
@@ -233,71 +461,14 @@ async def get_workflow_status(workflow_name: Optional[str] = None) -> str:
                 "message": "No events file found. Webhook server may not be running."
             })
 
-        with open(EVENTS_FILE, 'r') as f:
-            all_events = json.load(f)
-
-        # Filter events for workflow_run events
-        workflow_events = []
-        for event in (all_events if isinstance(all_events, list) else []):
-            if isinstance(event, dict):
-                # Check for workflow_run event type
-                if event.get('event_type') == 'workflow_run' or 'workflow_run' in event:
-                    workflow_events.append(event)
-                # Also check if it has workflow-related fields
-                elif any(key in event for key in ['workflow_name', 'workflow_id', 'status', 'conclusion']):
-                    workflow_events.append(event)
-
-        # If workflow_name provided, filter by that name
-        if workflow_name:
-            workflow_events = [
-                e for e in workflow_events
-                if e.get('workflow_name', '').lower() == workflow_name.lower() or
-                   e.get('workflow_run', {}).get('name', '').lower() == workflow_name.lower()
-            ]
-
-        # Group by workflow and show latest status
-        workflows = {}
-        for event in workflow_events:
-            # Extract workflow info from event structure
-            wf_name = (
-                event.get('workflow_name') or
-                event.get('workflow_run', {}).get('name') or
-                event.get('name') or
-                'Unknown Workflow'
-            )
+        _, _, latest_by_name, latest_by_name_lower = await _load_events()
 
-            # Extract status and conclusion
-            status = (
-                event.get('status') or
-                event.get('workflow_run', {}).get('status') or
-                'unknown'
-            )
-            conclusion = (
-                event.get('conclusion') or
-                event.get('workflow_run', {}).get('conclusion') or
-                'pending'
-            )
-
-            # Extract timestamp
-            timestamp = (
-                event.get('timestamp') or
-                event.get('workflow_run', {}).get('created_at') or
-                event.get('created_at') or
-                ''
-            )
-
-            # Update workflow info if this is newer or first occurrence
-            if wf_name not in workflows or timestamp > workflows[wf_name].get('last_update', ''):
-                workflows[wf_name] = {
-                    'name': wf_name,
-                    'status': status,
-                    'conclusion': conclusion,
-                    'last_update': timestamp,
-                    'run_id': event.get('workflow_run', {}).get('id') or event.get('run_id'),
-                    'run_number': event.get('workflow_run', {}).get('run_number') or event.get('run_number'),
-                    'event_name': event.get('workflow_run', {}).get('event') or event.get('event_name'),
-                    'head_branch': event.get('workflow_run', {}).get('head_branch') or event.get('head_branch')
-                }
+        # If workflow_name provided, look it up directly in the lowercase index
+        if workflow_name:
+            row = latest_by_name_lower.get(workflow_name.lower())
+            workflows = {row.name: asdict(row)} if row else {}
+        else:
+            workflows = {name: asdict(row) for name, row in latest_by_name.items()}
 
         # Format response
         result = {
@@ -310,7 +481,7 @@ async def get_workflow_status(workflow_name: Optional[str] = None) -> str:
         elif not workflows:
             result['message'] = "No workflow events found in the events file"
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
 
     except json.JSONDecodeError as e:
         return json.dumps({
@@ -326,10 +497,7 @@ async def get_workflow_status(workflow_name: Optional[str] = None) -> str:
 
 # ===== Module 2: MCP Prompts =====
 
-@mcp.prompt()
-async def analyze_ci_results():
-    """Analyze recent CI/CD results and provide insights."""
-    return """Analyze the recent CI/CD pipeline results and provide actionable insights.
+_ANALYZE_CI_RESULTS = """Analyze the recent CI/CD pipeline results and provide actionable insights.
 
 Please follow these steps:
 
@@ -362,9 +530,12 @@ Focus on actionable insights rather than just describing the data."""
 
 
 @mcp.prompt()
-async def create_deployment_summary():
-    """Generate a deployment summary for team communication."""
-    return """Generate a comprehensive deployment summary suitable for team communication and stakeholder updates.
+def analyze_ci_results():
+    """Analyze recent CI/CD results and provide insights."""
+    return _ANALYZE_CI_RESULTS
+
+
+_CREATE_DEPLOYMENT_SUMMARY = """Generate a comprehensive deployment summary suitable for team communication and stakeholder updates.
 
 Please follow these steps:
 
@@ -427,9 +598,12 @@ Highlight any critical issues or successes that need immediate attention."""
 
 
 @mcp.prompt()
-async def generate_pr_status_report():
-    """Generate a comprehensive PR status report including CI/CD results."""
-    return """Generate a comprehensive Pull Request status report that combines code changes analysis with CI/CD pipeline results.
+def create_deployment_summary():
+    """Generate a deployment summary for team communication."""
+    return _CREATE_DEPLOYMENT_SUMMARY
+
+
+_GENERATE_PR_STATUS_REPORT = """Generate a comprehensive Pull Request status report that combines code changes analysis with CI/CD pipeline results.
 
 Please follow these steps to create a complete PR status report:
 
@@ -514,9 +688,12 @@ Make the report scannable with good use of formatting and emojis for status (✅
 
 
 @mcp.prompt()
-async def troubleshoot_workflow_failure():
-    """Help troubleshoot a failing GitHub Actions workflow."""
-    return """Help diagnose and troubleshoot a failing GitHub Actions workflow using systematic debugging approach.
+def generate_pr_status_report():
+    """Generate a comprehensive PR status report including CI/CD results."""
+    return _GENERATE_PR_STATUS_REPORT
+
+
+_TROUBLESHOOT_WORKFLOW_FAILURE = """Help diagnose and troubleshoot a failing GitHub Actions workflow using systematic debugging approach.
 
 Please follow this troubleshooting process:
 
@@ -669,6 +846,12 @@ Focus on providing specific, actionable solutions rather than generic advice.
 Prioritize fixes by likelihood and ease of implementation."""
 
 
+@mcp.prompt()
+def troubleshoot_workflow_failure():
+    """Help troubleshoot a failing GitHub Actions workflow."""
+    return _TROUBLESHOOT_WORKFLOW_FAILURE
+
+
 if __name__ == "__main__":
     print("Starting PR Agent MCP server...")
     print("NOTE: Run webhook_server.py in a separate terminal to receive GitHub events")
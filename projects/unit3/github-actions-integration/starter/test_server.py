@@ -8,7 +8,7 @@ import json
 import pytest
 import asyncio
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock
 
 # Import your implemented functions
 try:
@@ -43,8 +43,8 @@ class TestAnalyzeFileChanges:
     @pytest.mark.asyncio
     async def test_returns_json_string(self):
         """Test that analyze_file_changes returns a JSON string."""
-        with patch('subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(stdout="", stderr="")
+        with patch('server._git', new_callable=AsyncMock) as mock_git:
+            mock_git.return_value = (b"", "", 0)
             
             result = await analyze_file_changes()
             
@@ -56,8 +56,8 @@ class TestAnalyzeFileChanges:
     @pytest.mark.asyncio
     async def test_includes_required_fields(self):
         """Test that the result includes expected fields."""
-        with patch('subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(stdout="M\tfile1.py\n", stderr="")
+        with patch('server._git', new_callable=AsyncMock) as mock_git:
+            mock_git.return_value = (b":100644 100644 abc1234 def5678 M\tfile1.py\n", "", 0)
             
             result = await analyze_file_changes()
             data = json.loads(result)
@@ -128,6 +128,107 @@ class TestSuggestTemplate:
             "Should include a template recommendation"
 
 
+@pytest.mark.skipif(not IMPORTS_SUCCESSFUL, reason="Imports failed")
+class TestGitHubActionsTools:
+    """Test the tools that read webhook events."""
+    
+    @staticmethod
+    def _write_events(path, events):
+        path.write_text("".join(json.dumps(e) + "\n" for e in events))
+    
+    @staticmethod
+    def _append_events(path, events):
+        with open(path, "a") as f:
+            f.writelines(json.dumps(e) + "\n" for e in events)
+    
+    @pytest.mark.asyncio
+    async def test_recent_events_most_recent_first(self, tmp_path, monkeypatch):
+        """Test that the latest events are returned newest first."""
+        import server
+        events_file = tmp_path / "github_events.jsonl"
+        monkeypatch.setattr(server, "EVENTS_FILE", events_file)
+        self._write_events(events_file, [
+            {"timestamp": f"2025-01-0{i}T00:00:00", "event_type": "push"}
+            for i in range(1, 6)
+        ])
+        
+        data = json.loads(await server.get_recent_actions_events(limit=2))
+        
+        assert data["total_events"] == 5
+        assert [e["timestamp"] for e in data["events"]] == [
+            "2025-01-05T00:00:00", "2025-01-04T00:00:00"
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_total_events_counts_whole_log(self, tmp_path, monkeypatch):
+        """Test that total_events counts every logged event, not just the cached ones."""
+        import server
+        events_file = tmp_path / "github_events.jsonl"
+        monkeypatch.setattr(server, "EVENTS_FILE", events_file)
+        monkeypatch.setattr(server, "MAX_CACHED_EVENTS", 3)
+        self._write_events(events_file, [
+            {"timestamp": f"2025-01-0{i}T00:00:00", "event_type": "push"}
+            for i in range(1, 6)
+        ])
+        
+        data = json.loads(await server.get_recent_actions_events(limit=10))
+        assert data["total_events"] == 5
+        assert data["returned_events"] == 3
+        
+        self._append_events(events_file, [
+            {"timestamp": "2025-01-06T00:00:00", "event_type": "push"}
+        ])
+        
+        data = json.loads(await server.get_recent_actions_events(limit=1))
+        assert data["total_events"] == 6
+        assert data["events"][0]["timestamp"] == "2025-01-06T00:00:00"
+    
+    @pytest.mark.asyncio
+    async def test_workflow_status_reloads_changed_file(self, tmp_path, monkeypatch):
+        """Test that workflow status reflects new events written to the file."""
+        import server
+        events_file = tmp_path / "github_events.jsonl"
+        monkeypatch.setattr(server, "EVENTS_FILE", events_file)
+        run = {"name": "CI", "status": "completed", "conclusion": "failure"}
+        self._write_events(events_file, [
+            {"timestamp": "2025-01-01T00:00:00", "event_type": "workflow_run", "workflow_run": run}
+        ])
+        
+        data = json.loads(await server.get_workflow_status("ci"))
+        assert data["workflows"]["CI"]["conclusion"] == "failure"
+        
+        self._append_events(events_file, [
+            {"timestamp": "2025-01-02T00:00:00", "event_type": "workflow_run",
+             "workflow_run": dict(run, conclusion="success")},
+            {"timestamp": "2025-01-02T00:00:01", "event_type": "check_run", "workflow_run": None},
+        ])
+        
+        data = json.loads(await server.get_workflow_status("CI"))
+        assert data["workflows"]["CI"]["conclusion"] == "success"
+        
+        # A rewritten (compacted) file is read again from the start
+        self._write_events(events_file, [
+            {"timestamp": "2025-01-03T00:00:00", "event_type": "workflow_run",
+             "workflow_run": dict(run, name="Deploy")},
+        ])
+        
+        data = json.loads(await server.get_recent_actions_events())
+        assert data["total_events"] == 1
+        
+        # So is one rewritten in place to a larger size
+        self._write_events(events_file, [
+            {"timestamp": f"2025-01-04T00:00:0{i}", "event_type": "push"} for i in range(4)
+        ])
+        
+        data = json.loads(await server.get_recent_actions_events())
+        assert data["total_events"] == 4
+        assert data["events"][0]["timestamp"] == "2025-01-04T00:00:03"
+        
+        data = json.loads(await server.get_workflow_status("CI"))
+        assert data["total_workflows"] == 0
+        assert "message" in data
+
+
 @pytest.mark.skipif(not IMPORTS_SUCCESSFUL, reason="Imports failed")
 class TestToolRegistration:
     """Test that tools are properly registered with FastMCP."""
@@ -44,7 +44,7 @@ class TestAnalyzeFileChanges:
     async def test_returns_json_string(self):
         """Test that analyze_file_changes returns a JSON string."""
         with patch('subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(stdout="", stderr="")
+            mock_run.return_value = MagicMock(stdout="", stderr="", returncode=0)
             
             result = await analyze_file_changes()
             
@@ -57,7 +57,7 @@ class TestAnalyzeFileChanges:
     async def test_includes_required_fields(self):
         """Test that the result includes expected fields."""
         with patch('subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(stdout="M\tfile1.py\n", stderr="")
+            mock_run.return_value = MagicMock(stdout="M\tfile1.py\n", stderr="", returncode=0)
             
             result = await analyze_file_changes()
             data = json.loads(result)
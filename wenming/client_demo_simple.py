@@ -3,6 +3,7 @@
 简化的 MCP 客户端演示 - 展示客户端是什么
 """
 
+import argparse
 import asyncio
 from mcp.client.stdio import stdio_client, StdioServerParameters
 from mcp import ClientSession
@@ -34,25 +35,31 @@ async def simple_client_demo():
             await session.initialize()
             print("[OK] Connected to server")
 
+            # 资源列表、PR 指南和工具列表互不依赖，同时发出请求
+            async with asyncio.TaskGroup() as tg:
+                resources_task = tg.create_task(session.list_resources())
+                pr_guide_task = tg.create_task(session.read_resource(
+                    AnyUrl("guidelines://pr-guidelines")
+                ))
+                tools_task = tg.create_task(session.list_tools())
+
             # 4. 发现服务器提供了什么资源
             print("\nStep 2: Checking available resources...")
-            resources = await session.list_resources()
+            resources = resources_task.result()
             print(f"Found {len(resources.resources)} resources:")
             for r in resources.resources[:3]:  # 显示前3个
                 print(f"  - {r.uri}")
 
             # 5. 使用资源 - 读取 PR 指南
             print("\nStep 3: Reading a resource (PR Guidelines)...")
-            pr_guide = await session.read_resource(
-                AnyUrl("guidelines://pr-guidelines")
-            )
+            pr_guide = pr_guide_task.result()
             if pr_guide.contents:
                 content = pr_guide.contents[0].text
                 print(f"Resource content preview: {content[:100]}...")
 
             # 6. 查看可用的工具
             print("\nStep 4: Checking available tools...")
-            tools = await session.list_tools()
+            tools = tools_task.result()
             print(f"Found {len(tools.tools)} tools:")
             for t in tools.tools:
                 print(f"  - {t.name}: {t.description}")
@@ -107,18 +114,32 @@ async def explain_architecture():
     """)
     print("="*60)
 
-if __name__ == "__main__":
-    print("\nChoose demo:")
-    print("1. Run simple client demo")
-    print("2. View architecture explanation")
+def _leaf_exceptions(exc: BaseException):
+    """Yield the individual exceptions inside (possibly nested) exception groups"""
+    if isinstance(exc, BaseExceptionGroup):
+        for sub in exc.exceptions:
+            yield from _leaf_exceptions(sub)
+    else:
+        yield exc
 
-    choice = input("\nPlease choose (1 or 2): ").strip()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simple MCP client demo")
+    parser.add_argument(
+        "--mode",
+        choices=["demo", "arch"],
+        default="demo",
+        help="demo: run simple client demo; arch: view architecture explanation",
+    )
+    args = parser.parse_args()
 
-    if choice == "1":
+    if args.mode == "demo":
         try:
             asyncio.run(simple_client_demo())
         except Exception as e:
-            print(f"\nError: {e}")
+            # Concurrent requests (and the MCP client itself) raise ExceptionGroups;
+            # show the underlying errors rather than the group's summary
+            for error in _leaf_exceptions(e):
+                print(f"\nError: {error}")
             print("Hint: Make sure resources_server.py is in the same directory")
     else:
-        asyncio.run(explain_architecture())
\ No newline at end of file
+        asyncio.run(explain_architecture())
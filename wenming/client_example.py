@@ -6,10 +6,15 @@ This shows how the client (Host application) programmatically decides when to lo
 
 import asyncio
 from enum import Enum
+from typing import Any
 from mcp.client.stdio import stdio_client, StdioServerParameters
 from mcp import ClientSession
 from pydantic import AnyUrl
 
+def _text(result) -> str:
+    """Text of the first content item of a read_resource result, or "" if empty"""
+    return result.contents[0].text if result.contents else ""
+
 class UserAction(Enum):
     """User actions that trigger resource loading"""
     OPEN_PR_EDITOR = "open_pr_editor"
@@ -36,6 +41,19 @@ class SmartCodeEditor:
         self.session = session
         self.context = ApplicationContext()
         self.ai_context = []  # Context provided to LLM
+        self._resource_cache: dict[str, Any] = {}
+        self._resource_locks: dict[str, asyncio.Lock] = {}
+
+    async def _read(self, uri: str):
+        """Read a resource once per session; later reads of the same URI are served from cache"""
+        if uri in self._resource_cache:
+            return self._resource_cache[uri]
+        # One lock per URI so concurrent first reads share a single request
+        lock = self._resource_locks.setdefault(uri, asyncio.Lock())
+        async with lock:
+            if uri not in self._resource_cache:
+                self._resource_cache[uri] = await self.session.read_resource(AnyUrl(uri))
+        return self._resource_cache[uri]
 
     async def handle_user_action(self, action: UserAction, **kwargs):
         """
@@ -47,12 +65,10 @@ class SmartCodeEditor:
         if action == UserAction.OPEN_PR_EDITOR:
             # Application logic: When user opens PR editor, load PR guidelines
             print("Application Decision: User is creating a PR, loading PR guidelines...")
-            pr_guidelines = await self.session.read_resource(
-                AnyUrl("guidelines://pr-guidelines")
-            )
+            pr_guidelines = await self._read("guidelines://pr-guidelines")
             self.ai_context.append({
                 "type": "resource",
-                "content": pr_guidelines.contents[0].text if pr_guidelines.contents else "",
+                "content": _text(pr_guidelines),
                 "reason": "User opened PR editor"
             })
             print("[OK] PR guidelines loaded into AI context")
@@ -61,12 +77,10 @@ class SmartCodeEditor:
             # Application logic: When user starts coding, load coding standards
             file_type = kwargs.get('file_type', 'python')
             print(f"Application Decision: User is coding in {file_type}, loading coding standards...")
-            coding_standards = await self.session.read_resource(
-                AnyUrl("guidelines://coding-standards")
-            )
+            coding_standards = await self._read("guidelines://coding-standards")
             self.ai_context.append({
                 "type": "resource",
-                "content": coding_standards.contents[0].text if coding_standards.contents else "",
+                "content": _text(coding_standards),
                 "reason": f"User started coding in {file_type}"
             })
             print("[OK] Coding standards loaded into AI context")
@@ -74,12 +88,10 @@ class SmartCodeEditor:
         elif action == UserAction.REPORT_BUG:
             # Application logic: When user wants to report bug, load bug template
             print("Application Decision: User reporting bug, loading bug template...")
-            bug_template = await self.session.read_resource(
-                AnyUrl("templates://bug-report")
-            )
+            bug_template = await self._read("templates://bug-report")
             self.ai_context.append({
                 "type": "resource",
-                "content": bug_template.contents[0].text if bug_template.contents else "",
+                "content": _text(bug_template),
                 "reason": "User initiated bug report"
             })
             print("[OK] Bug template loaded and ready to use")
@@ -87,12 +99,10 @@ class SmartCodeEditor:
         elif action == UserAction.REQUEST_FEATURE:
             # Application logic: When user requests feature, load feature template
             print("Application Decision: User requesting feature, loading feature template...")
-            feature_template = await self.session.read_resource(
-                AnyUrl("templates://feature-request")
-            )
+            feature_template = await self._read("templates://feature-request")
             self.ai_context.append({
                 "type": "resource",
-                "content": feature_template.contents[0].text if feature_template.contents else "",
+                "content": _text(feature_template),
                 "reason": "User initiated feature request"
             })
             print("[OK] Feature template loaded")
@@ -101,25 +111,22 @@ class SmartCodeEditor:
             # Application logic: Multiple resources needed for refactoring
             print("Application Decision: User starting refactoring, loading relevant resources...")
 
-            # Load refactoring template
-            refactor_template = await self.session.read_resource(
-                AnyUrl("templates://refactor")
-            )
-
-            # Also load coding standards for reference
-            coding_standards = await self.session.read_resource(
-                AnyUrl("guidelines://coding-standards")
+            # Load refactoring template and, for reference, coding standards;
+            # the reads are independent, so both requests are in flight at once
+            refactor_template, coding_standards = await asyncio.gather(
+                self._read("templates://refactor"),
+                self._read("guidelines://coding-standards")
             )
 
             self.ai_context.extend([
                 {
                     "type": "resource",
-                    "content": refactor_template.contents[0].text if refactor_template.contents else "",
+                    "content": _text(refactor_template),
                     "reason": "User initiated refactoring"
                 },
                 {
                     "type": "resource",
-                    "content": coding_standards.contents[0].text if coding_standards.contents else "",
+                    "content": _text(coding_standards),
                     "reason": "Coding standards for refactoring reference"
                 }
             ])
@@ -128,11 +135,9 @@ class SmartCodeEditor:
         elif action == UserAction.VIEW_GUIDELINES:
             # Application logic: Show all available guidelines
             print("Application Decision: User wants to view all guidelines...")
-            guidelines_list = await self.session.read_resource(
-                AnyUrl("guidelines://list")
-            )
+            guidelines_list = await self._read("guidelines://list")
             print("[OK] Guidelines list loaded")
-            print(guidelines_list.contents[0].text if guidelines_list.contents else "")
+            print(_text(guidelines_list))
 
     async def on_file_open(self, file_path: str):
         """
@@ -155,12 +160,10 @@ class SmartCodeEditor:
         # Application decides: Test files need test template
         elif 'test_' in file_path or '_test.py' in file_path:
             print("Application Decision: Test file opened, loading test template...")
-            test_template = await self.session.read_resource(
-                AnyUrl("templates://test")
-            )
+            test_template = await self._read("templates://test")
             self.ai_context.append({
                 "type": "resource",
-                "content": test_template.contents[0].text if test_template.contents else "",
+                "content": _text(test_template),
                 "reason": "Test file opened"
             })
             print("[OK] Test template loaded")
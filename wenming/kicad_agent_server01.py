@@ -5,26 +5,51 @@ KiCad MCP Server - Demonstrates three representative MCP tools for KiCad manipul
 From simple to complex, showcasing the KiCad Python API capabilities
 """
 
-from typing import Dict, List, Optional
+import asyncio
+import functools
+import threading
+from typing import Optional
 
 from kipy import KiCad
-from kipy.board_types import (
-    BoardLayer,
-    FootprintInstance,
-    Net,
-    Track,
-    Via,
-    ViaType,
-    Zone,
-)
+from kipy.board_types import Via, ViaType
 from kipy.geometry import Angle, Vector2
 from kipy.util.units import from_mm, to_mm
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("kicad-agent")
 
+# A single KiCad client is shared by all tools so the IPC connection is set up once
+_KICAD: Optional[KiCad] = None
+
+
+def _get_kicad() -> KiCad:
+    """Return the shared KiCad client, connecting on first use"""
+    global _KICAD
+    if _KICAD is None:
+        _KICAD = KiCad()
+    return _KICAD
+
+
+# The KiCad IPC socket handles one request at a time, so tool bodies take turns
+_KICAD_LOCK = threading.Lock()
+
+
+def _in_thread(fn):
+    """Run a blocking KiCad tool in a worker thread so the event loop stays free"""
+
+    def locked(*args, **kwargs):
+        with _KICAD_LOCK:
+            return fn(*args, **kwargs)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(locked, *args, **kwargs)
+
+    return wrapper
+
 
 @mcp.tool()
+@_in_thread
 def get_board_info() -> str:
     """
     Tool 1 (Simple): Get basic information about the currently open KiCad board.
@@ -39,7 +64,7 @@ def get_board_info() -> str:
     This demonstrates basic read operations on the KiCad board.
     """
     try:
-        kicad = KiCad()
+        kicad = _get_kicad()
         board = kicad.get_board()
 
         footprints = board.get_footprints()
@@ -57,21 +82,22 @@ def get_board_info() -> str:
             "copper_layer_count": copper_layers,
         }
 
-        result = f"Board Information:\n"
-        result += f"  Filename: {info['filename']}\n"
-        result += f"  Footprints: {info['footprint_count']}\n"
-        result += f"  Nets: {info['net_count']}\n"
-        result += f"  Tracks: {info['track_count']}\n"
-        result += f"  Vias: {info['via_count']}\n"
-        result += f"  Copper Layers: {info['copper_layer_count']}\n"
+        parts = [f"Board Information:\n"]
+        parts.append(f"  Filename: {info['filename']}\n")
+        parts.append(f"  Footprints: {info['footprint_count']}\n")
+        parts.append(f"  Nets: {info['net_count']}\n")
+        parts.append(f"  Tracks: {info['track_count']}\n")
+        parts.append(f"  Vias: {info['via_count']}\n")
+        parts.append(f"  Copper Layers: {info['copper_layer_count']}\n")
 
-        return result
+        return "".join(parts)
 
     except Exception as e:
         return f"Error: {str(e)}\nMake sure KiCad is running with API server enabled and a board is open."
 
 
 @mcp.tool()
+@_in_thread
 def create_via_grid(
     start_x_mm: float,
     start_y_mm: float,
@@ -102,11 +128,9 @@ def create_via_grid(
     - Batch operations using create_items
     """
     try:
-        kicad = KiCad()
+        kicad = _get_kicad()
         board = kicad.get_board()
 
-        vias = []
-
         target_net = None
         if net_name:
             nets = board.get_nets()
@@ -117,41 +141,52 @@ def create_via_grid(
             if target_net is None:
                 return f"Error: Net '{net_name}' not found on board"
 
-        for row in range(grid_rows):
-            for col in range(grid_cols):
+        # Grid coordinates and via sizes are computed once, outside the per-via loop
+        xs_mm = [start_x_mm + col * spacing_mm for col in range(grid_cols)]
+        ys_mm = [start_y_mm + row * spacing_mm for row in range(grid_rows)]
+        diameter_nm = from_mm(via_diameter_mm)
+        drill_nm = from_mm(via_drill_mm)
+        via_type = ViaType.VT_THROUGH
+        from_xy_mm = Vector2.from_xy_mm
+
+        # The grid size is known up front, so the list is allocated once
+        vias = [None] * (grid_rows * grid_cols)
+        k = 0
+        for y_mm in ys_mm:
+            for x_mm in xs_mm:
                 via = Via()
 
-                x_mm = start_x_mm + col * spacing_mm
-                y_mm = start_y_mm + row * spacing_mm
-                via.position = Vector2.from_xy_mm(x_mm, y_mm)
+                via.position = from_xy_mm(x_mm, y_mm)
 
-                via.type = ViaType.VT_THROUGH
-                via.diameter = from_mm(via_diameter_mm)
-                via.drill_diameter = from_mm(via_drill_mm)
+                via.type = via_type
+                via.diameter = diameter_nm
+                via.drill_diameter = drill_nm
 
                 if target_net:
                     via.net = target_net
 
                 via.locked = False
-                vias.append(via)
+                vias[k] = via
+                k += 1
 
         board.create_items(vias)
 
-        result = f"Successfully created {len(vias)} vias!\n"
-        result += f"  Grid: {grid_rows} x {grid_cols}\n"
-        result += f"  Starting position: ({start_x_mm}mm, {start_y_mm}mm)\n"
-        result += f"  Spacing: {spacing_mm}mm\n"
-        result += f"  Via specs: diameter={via_diameter_mm}mm, drill={via_drill_mm}mm\n"
+        parts = [f"Successfully created {len(vias)} vias!\n"]
+        parts.append(f"  Grid: {grid_rows} x {grid_cols}\n")
+        parts.append(f"  Starting position: ({start_x_mm}mm, {start_y_mm}mm)\n")
+        parts.append(f"  Spacing: {spacing_mm}mm\n")
+        parts.append(f"  Via specs: diameter={via_diameter_mm}mm, drill={via_drill_mm}mm\n")
         if net_name:
-            result += f"  Net: {net_name}\n"
+            parts.append(f"  Net: {net_name}\n")
 
-        return result
+        return "".join(parts)
 
     except Exception as e:
         return f"Error creating via grid: {str(e)}"
 
 
 @mcp.tool()
+@_in_thread
 def organize_footprints_in_grid(
     component_prefix: str,
     start_x_mm: float,
@@ -184,35 +219,40 @@ def organize_footprints_in_grid(
              will arrange all resistors in a 5-column grid starting at (50mm, 50mm)
     """
     try:
-        kicad = KiCad()
+        kicad = _get_kicad()
         board = kicad.get_board()
 
         all_footprints = board.get_footprints()
 
-        filtered_footprints = [
-            fp
-            for fp in all_footprints
-            if fp.reference_field.text.value.startswith(component_prefix)
-        ]
+        # Read each reference once and reuse it for both the filter and the sort key
+        matches = []
+        for fp in all_footprints:
+            reference = fp.reference_field.text.value
+            if reference.startswith(component_prefix):
+                matches.append((reference, fp))
 
-        if not filtered_footprints:
+        if not matches:
             return f"No footprints found with prefix '{component_prefix}'"
 
-        filtered_footprints.sort(key=lambda fp: fp.reference_field.text.value)
+        matches.sort(key=lambda match: match[0])
+        filtered_footprints = [fp for _, fp in matches]
+
+        # The rotation is the same for every footprint, so build it once
+        orientation = Angle.from_degrees(rotation_degrees)
+        from_xy_mm = Vector2.from_xy_mm
 
         commit = board.begin_commit()
 
         try:
             for idx, footprint in enumerate(filtered_footprints):
-                row = idx // columns
-                col = idx % columns
+                row, col = divmod(idx, columns)
 
                 new_x = start_x_mm + col * spacing_x_mm
                 new_y = start_y_mm + row * spacing_y_mm
 
-                footprint.position = Vector2.from_xy_mm(new_x, new_y)
+                footprint.position = from_xy_mm(new_x, new_y)
 
-                footprint.orientation = Angle.from_degrees(rotation_degrees)
+                footprint.orientation = orientation
 
             board.update_items(filtered_footprints)
 
@@ -222,23 +262,23 @@ def organize_footprints_in_grid(
 
             rows_used = (len(filtered_footprints) - 1) // columns + 1
 
-            result = f"Successfully organized {len(filtered_footprints)} footprints!\n"
-            result += f"  Component prefix: {component_prefix}\n"
-            result += f"  Grid layout: {rows_used} rows x {columns} columns\n"
-            result += f"  Starting position: ({start_x_mm}mm, {start_y_mm}mm)\n"
-            result += f"  Spacing: {spacing_x_mm}mm x {spacing_y_mm}mm\n"
-            result += f"  Rotation: {rotation_degrees} degrees\n"
-            result += f"\n  Organized components:\n"
+            parts = [f"Successfully organized {len(filtered_footprints)} footprints!\n"]
+            parts.append(f"  Component prefix: {component_prefix}\n")
+            parts.append(f"  Grid layout: {rows_used} rows x {columns} columns\n")
+            parts.append(f"  Starting position: ({start_x_mm}mm, {start_y_mm}mm)\n")
+            parts.append(f"  Spacing: {spacing_x_mm}mm x {spacing_y_mm}mm\n")
+            parts.append(f"  Rotation: {rotation_degrees} degrees\n")
+            parts.append(f"\n  Organized components:\n")
 
             for fp in filtered_footprints[:10]:
                 x_pos = to_mm(fp.position.x)
                 y_pos = to_mm(fp.position.y)
-                result += f"    - {fp.reference_field.text.value}: ({x_pos:.2f}mm, {y_pos:.2f}mm)\n"
+                parts.append(f"    - {fp.reference_field.text.value}: ({x_pos:.2f}mm, {y_pos:.2f}mm)\n")
 
             if len(filtered_footprints) > 10:
-                result += f"    ... and {len(filtered_footprints) - 10} more\n"
+                parts.append(f"    ... and {len(filtered_footprints) - 10} more\n")
 
-            return result
+            return "".join(parts)
 
         except Exception as e:
             board.drop_commit(commit)
@@ -249,6 +289,7 @@ def organize_footprints_in_grid(
 
 
 @mcp.tool()
+@_in_thread
 def adjust_pad_clearance(
     net_pattern: str,
     clearance_mm: Optional[float] = None,
@@ -284,63 +325,81 @@ def adjust_pad_clearance(
         if clearance_mm is not None and clearance_multiplier is not None:
             return "Error: Cannot specify both clearance_mm and clearance_multiplier"
 
-        kicad = KiCad()
+        kicad = _get_kicad()
         board = kicad.get_board()
 
         all_nets = board.get_nets()
-        matching_nets = [
-            net for net in all_nets if net.name.startswith(net_pattern)
-        ]
+        matching_nets = []
+        matching_net_names = set()
+        for net in all_nets:
+            if net.name.startswith(net_pattern):
+                matching_nets.append(net)
+                matching_net_names.add(net.name)
 
         if not matching_nets:
             return f"No nets found matching pattern '{net_pattern}*'"
 
         all_footprints = board.get_footprints()
 
+        # An absolute clearance is the same for every pad, so convert it once
+        clearance_nm = from_mm(clearance_mm) if clearance_mm is not None else None
+
         modified_pads = []
+        modified_footprints = []
         old_clearances = []
         pad_info = []
 
         for footprint in all_footprints:
+            footprint_modified = False
+            footprint_ref = None
             pads = footprint.definition.pads
             for pad in pads:
-                if pad.net is None:
+                # pad.net builds a new wrapper on each access, so read it once
+                pad_net = pad.net
+                if pad_net is None:
                     continue
 
-                if any(pad.net.name == net.name for net in matching_nets):
-                    old_clearance_nm = pad._proto.copper_clearance_override.value_nm if pad._proto.HasField("copper_clearance_override") else 0
+                pad_net_name = pad_net.name
+                if pad_net_name in matching_net_names:
+                    pad_proto = pad._proto
+                    old_clearance_nm = pad_proto.copper_clearance_override.value_nm if pad_proto.HasField("copper_clearance_override") else 0
                     old_clearance = to_mm(old_clearance_nm) if old_clearance_nm else 0.0
 
                     if clearance_mm is not None:
                         new_clearance_mm = clearance_mm
+                        new_clearance_nm = clearance_nm
                     else:
                         if old_clearance == 0.0:
                             old_clearance = 0.2
                         new_clearance_mm = old_clearance * clearance_multiplier
+                        new_clearance_nm = from_mm(new_clearance_mm)
 
-                    pad._proto.copper_clearance_override.value_nm = from_mm(new_clearance_mm)
+                    pad_proto.copper_clearance_override.value_nm = new_clearance_nm
 
                     modified_pads.append(pad)
+                    if not footprint_modified:
+                        footprint_modified = True
+                        footprint_ref = footprint.reference_field.text.value
                     old_clearances.append(old_clearance)
                     pad_info.append({
-                        "footprint": footprint.reference_field.text.value,
+                        "footprint": footprint_ref,
                         "pad": pad.number,
-                        "net": pad.net.name,
+                        "net": pad_net_name,
                         "old": old_clearance,
                         "new": new_clearance_mm,
                     })
 
+            # Each footprint is visited once, so it is recorded at most once
+            if footprint_modified:
+                modified_footprints.append(footprint)
+
         if not modified_pads:
             return f"No pads found on nets matching pattern '{net_pattern}*'"
 
         commit = board.begin_commit()
 
         try:
-            footprints_to_update = list(set(
-                fp for fp in all_footprints if any(pad in fp.definition.pads for pad in modified_pads)
-            ))
-
-            board.update_items(footprints_to_update)
+            board.update_items(modified_footprints)
 
             if clearance_mm is not None:
                 commit_msg = f"Adjust pad clearance for {net_pattern}* nets to {clearance_mm}mm"
@@ -349,27 +408,27 @@ def adjust_pad_clearance(
 
             board.push_commit(commit, commit_msg)
 
-            result = f"Successfully adjusted clearance for {len(modified_pads)} pad(s) on {len(matching_nets)} matching net(s)!\n"
-            result += f"  Net pattern: '{net_pattern}*'\n"
-            result += f"  Matching nets: {', '.join([net.name for net in matching_nets[:5]])}\n"
+            parts = [f"Successfully adjusted clearance for {len(modified_pads)} pad(s) on {len(matching_nets)} matching net(s)!\n"]
+            parts.append(f"  Net pattern: '{net_pattern}*'\n")
+            parts.append(f"  Matching nets: {', '.join([net.name for net in matching_nets[:5]])}\n")
 
             if len(matching_nets) > 5:
-                result += f"    ... and {len(matching_nets) - 5} more net(s)\n"
+                parts.append(f"    ... and {len(matching_nets) - 5} more net(s)\n")
 
             if clearance_mm is not None:
-                result += f"  New clearance: {clearance_mm}mm (absolute)\n"
+                parts.append(f"  New clearance: {clearance_mm}mm (absolute)\n")
             else:
-                result += f"  Clearance multiplier: {clearance_multiplier}x\n"
+                parts.append(f"  Clearance multiplier: {clearance_multiplier}x\n")
 
-            result += f"\n  Sample of modified pads:\n"
+            parts.append(f"\n  Sample of modified pads:\n")
 
             for info in pad_info[:10]:
-                result += f"    {info['footprint']}.{info['pad']} ({info['net']}): {info['old']:.3f}mm -> {info['new']:.3f}mm\n"
+                parts.append(f"    {info['footprint']}.{info['pad']} ({info['net']}): {info['old']:.3f}mm -> {info['new']:.3f}mm\n")
 
             if len(pad_info) > 10:
-                result += f"    ... and {len(pad_info) - 10} more pad(s)\n"
+                parts.append(f"    ... and {len(pad_info) - 10} more pad(s)\n")
 
-            return result
+            return "".join(parts)
 
         except Exception as e:
             board.drop_commit(commit)
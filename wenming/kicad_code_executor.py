@@ -13,30 +13,37 @@ Instead of pre-defining specific tools, this allows the LLM to:
 - Execute the generated code through the execute_kicad_code tool
 """
 
-import sys
 import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from functools import lru_cache
 from io import StringIO
 from pathlib import Path
 from typing import Optional
 
-from kipy import KiCad
-from kipy.board_types import (
-    BoardLayer,
-    FootprintInstance,
-    Net,
-    Pad,
-    Track,
-    Via,
-    ViaType,
-    Zone,
-)
-from kipy.geometry import Angle, Vector2
-from kipy.util.units import from_mm, to_mm
 from mcp.server.fastmcp import FastMCP
 from mcp.server.fastmcp.prompts import base
 
 mcp = FastMCP("kicad-code-executor")
 
+# kicad-python checkout whose sources and examples are served as resources
+KICAD_PYTHON_PATH = Path(__file__).parent.parent / "kicad-python"
+BOARD_PY = KICAD_PYTHON_PATH / "kipy" / "board.py"
+BOARD_TYPES_PY = KICAD_PYTHON_PATH / "kipy" / "board_types.py"
+GEOMETRY_PY = KICAD_PYTHON_PATH / "kipy" / "geometry.py"
+EXAMPLES_PATH = KICAD_PYTHON_PATH / "examples"
+
+
+@lru_cache(maxsize=128)
+def _read_source(path: Path) -> Optional[str]:
+    """Read a kicad-python source file once; returns None if it does not exist.
+
+    The API sources and examples do not change while the server runs, so each
+    file is read from disk only on its first request.
+    """
+    if not path.exists():
+        return None
+    return path.read_text(encoding="utf-8")
+
 
 @mcp.prompt(
     title="KiCad System Instructions",
@@ -98,11 +105,9 @@ def get_board_api() -> str:
     - Working with nets, layers, design rules
     - Commit transactions for undo/redo
     """
-    kicad_python_path = Path(__file__).parent.parent / "kicad-python"
-    board_py = kicad_python_path / "kipy" / "board.py"
-
-    if board_py.exists():
-        return board_py.read_text(encoding="utf-8")
+    source = _read_source(BOARD_PY)
+    if source is not None:
+        return source
     return "Error: board.py not found. Make sure kicad-python is in the repository."
 
 
@@ -116,11 +121,9 @@ def get_board_types_api() -> str:
     - Net, Field, BoardShape, BoardText
     - PadStack, DrillProperties, etc.
     """
-    kicad_python_path = Path(__file__).parent.parent / "kicad-python"
-    board_types_py = kicad_python_path / "kipy" / "board_types.py"
-
-    if board_types_py.exists():
-        return board_types_py.read_text(encoding="utf-8")
+    source = _read_source(BOARD_TYPES_PY)
+    if source is not None:
+        return source
     return "Error: board_types.py not found."
 
 
@@ -134,11 +137,9 @@ def get_geometry_api() -> str:
     - PolygonWithHoles
     - Geometric operations
     """
-    kicad_python_path = Path(__file__).parent.parent / "kicad-python"
-    geometry_py = kicad_python_path / "kipy" / "geometry.py"
-
-    if geometry_py.exists():
-        return geometry_py.read_text(encoding="utf-8")
+    source = _read_source(GEOMETRY_PY)
+    if source is not None:
+        return source
     return "Error: geometry.py not found."
 
 
@@ -152,14 +153,11 @@ def list_examples() -> str:
     - Moving and organizing footprints
     - Selecting and highlighting items
     """
-    kicad_python_path = Path(__file__).parent.parent / "kicad-python"
-    examples_dir = kicad_python_path / "examples"
-
-    if not examples_dir.exists():
+    if not EXAMPLES_PATH.exists():
         return "Error: examples directory not found."
 
     examples = []
-    for py_file in sorted(examples_dir.glob("*.py")):
+    for py_file in sorted(EXAMPLES_PATH.glob("*.py")):
         examples.append(py_file.name)
 
     return "Available examples:\n" + "\n".join(f"  - {ex}" for ex in examples)
@@ -173,13 +171,13 @@ def get_example(example_name: str) -> str:
     Use the list resource to see available examples first.
     Example: kicad-api://examples/create_via_grid.py
     """
-    kicad_python_path = Path(__file__).parent.parent / "kicad-python"
-    example_path = kicad_python_path / "examples" / example_name
+    example_path = EXAMPLES_PATH / example_name
 
-    if not example_path.exists():
+    source = _read_source(example_path)
+    if source is None:
         return f"Error: Example '{example_name}' not found. Use kicad-api://examples/list to see available examples."
 
-    return example_path.read_text(encoding="utf-8")
+    return source
 
 
 @mcp.resource("kicad-api://overview")
@@ -273,6 +271,16 @@ except Exception as e:
 """
 
 
+# Friendly documentation names accepted by read_kicad_api_docs
+DOC_HANDLERS = {
+    "overview": get_api_overview,
+    "board": get_board_api,
+    "board_types": get_board_types_api,
+    "geometry": get_geometry_api,
+    "examples": list_examples,
+}
+
+
 @mcp.tool()
 def read_kicad_api_docs(doc_name: str) -> str:
     """
@@ -303,35 +311,15 @@ def read_kicad_api_docs(doc_name: str) -> str:
     """
     doc_name = doc_name.lower().strip()
 
-    # Map friendly names to resource URIs
-    doc_map = {
-        "overview": "kicad-api://overview",
-        "board": "kicad-api://board.py",
-        "board_types": "kicad-api://board_types.py",
-        "geometry": "kicad-api://geometry.py",
-        "examples": "kicad-api://examples/list",
-    }
-
     # Handle example requests
     if doc_name.startswith("example:"):
         example_name = doc_name[8:].strip()
         return get_example(example_name)
 
-    # Get the resource URI
-    if doc_name in doc_map:
-        uri = doc_map[doc_name]
-
-        # Call the appropriate resource function
-        if uri == "kicad-api://overview":
-            return get_api_overview()
-        elif uri == "kicad-api://board.py":
-            return get_board_api()
-        elif uri == "kicad-api://board_types.py":
-            return get_board_types_api()
-        elif uri == "kicad-api://geometry.py":
-            return get_geometry_api()
-        elif uri == "kicad-api://examples/list":
-            return list_examples()
+    # Call the resource function behind the friendly name
+    handler = DOC_HANDLERS.get(doc_name)
+    if handler is not None:
+        return handler()
 
     return f"""Error: Unknown documentation '{doc_name}'
 
@@ -347,8 +335,55 @@ Example: read_kicad_api_docs("overview")
 """
 
 
+@lru_cache(maxsize=1)
+def _exec_globals() -> dict:
+    """Names pre-loaded into the namespace of every execute_kicad_code run.
+
+    kipy is imported on the first execution only, so serving the documentation
+    resources never loads the KiCad API and its protobuf stack.
+    """
+    from kipy import KiCad
+    from kipy.board_types import (
+        BoardLayer,
+        FootprintInstance,
+        Net,
+        Pad,
+        Track,
+        Via,
+        ViaType,
+        Zone,
+    )
+    from kipy.geometry import Angle, Vector2
+    from kipy.util.units import from_mm, to_mm
+
+    return {
+        "KiCad": KiCad,
+        "BoardLayer": BoardLayer,
+        "FootprintInstance": FootprintInstance,
+        "Net": Net,
+        "Pad": Pad,
+        "Track": Track,
+        "Via": Via,
+        "ViaType": ViaType,
+        "Zone": Zone,
+        "Angle": Angle,
+        "Vector2": Vector2,
+        "from_mm": from_mm,
+        "to_mm": to_mm,
+        "__name__": "__main__",
+    }
+
+
+@lru_cache(maxsize=256)
+def _compile_code(code: str):
+    """Compile agent code once; retries of the same snippet reuse the code object"""
+    return compile(code, "<agent-code>", "exec")
+
+
 @mcp.tool()
-def execute_kicad_code(code: str, description: Optional[str] = None) -> str:
+def execute_kicad_code(
+    code: str, description: Optional[str] = None, verbose: bool = False
+) -> str:
     """
     Execute Python code that uses the KiCad API.
 
@@ -372,13 +407,15 @@ def execute_kicad_code(code: str, description: Optional[str] = None) -> str:
     Args:
         code: Python code to execute. Should use kipy (kicad-python) API.
         description: Optional description of what the code does (for logging)
+        verbose: Include the full traceback when the code raises (default: false).
+            Re-run with verbose=True if the exception type and message are not enough.
 
     Returns:
         Execution result including:
         - Status (success/error)
         - Standard output
         - Standard error
-        - Exception details (if any)
+        - Exception details (if any; traceback only with verbose=True)
 
     Pre-loaded imports (already available in code):
     - from kipy import KiCad
@@ -418,37 +455,18 @@ def execute_kicad_code(code: str, description: Optional[str] = None) -> str:
     stdout_capture = StringIO()
     stderr_capture = StringIO()
 
-    old_stdout = sys.stdout
-    old_stderr = sys.stderr
-
     try:
-        sys.stdout = stdout_capture
-        sys.stderr = stderr_capture
-
-        if description:
-            print(f"Executing: {description}")
-            print("-" * 60)
-
-        exec_globals = {
-            "KiCad": KiCad,
-            "BoardLayer": BoardLayer,
-            "FootprintInstance": FootprintInstance,
-            "Net": Net,
-            "Pad": Pad,
-            "Track": Track,
-            "Via": Via,
-            "ViaType": ViaType,
-            "Zone": Zone,
-            "Angle": Angle,
-            "Vector2": Vector2,
-            "from_mm": from_mm,
-            "to_mm": to_mm,
-            "__name__": "__main__",
-        }
+        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+            if description:
+                print(f"Executing: {description}")
+                print("-" * 60)
 
-        exec_locals = {}
+            # Each run gets its own copy so one snippet's names don't leak into the next
+            exec_globals = dict(_exec_globals())
 
-        exec(code, exec_globals, exec_locals)
+            exec_locals = {}
+
+            exec(_compile_code(code), exec_globals, exec_locals)
 
         result = {
             "status": "success",
@@ -463,40 +481,46 @@ def execute_kicad_code(code: str, description: Optional[str] = None) -> str:
             "status": "error",
             "error": str(e),
             "error_type": type(e).__name__,
-            "traceback": traceback.format_exc(),
-            "stdout": stdout_capture.getvalue(),
-            "stderr": stderr_capture.getvalue(),
         }
+        # Empty captures are left out; _format_result skips missing sections
+        stdout = stdout_capture.getvalue()
+        if stdout:
+            result["stdout"] = stdout
+        stderr = stderr_capture.getvalue()
+        if stderr:
+            result["stderr"] = stderr
+        # Formatting every frame is the expensive part of a failure, so only on request
+        if verbose:
+            result["traceback"] = traceback.format_exc()
         return _format_result(result)
 
-    finally:
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
+
+RESULT_SEPARATOR = "=" * 60
 
 
 def _format_result(result: dict) -> str:
     """Format execution result for display"""
-    lines = []
-
-    lines.append(f"{'='*60}")
-    lines.append(f"Execution Status: {result['status'].upper()}")
-    lines.append(f"{'='*60}")
+    lines = [
+        RESULT_SEPARATOR,
+        f"Execution Status: {result['status'].upper()}",
+        RESULT_SEPARATOR,
+    ]
 
     if result.get("stdout"):
-        lines.append("\nOutput:")
-        lines.append(result["stdout"].rstrip())
+        lines += ("\nOutput:", result["stdout"].rstrip())
 
     if result.get("stderr"):
-        lines.append("\nWarnings/Errors:")
-        lines.append(result["stderr"].rstrip())
+        lines += ("\nWarnings/Errors:", result["stderr"].rstrip())
 
     if result["status"] == "error":
-        lines.append(f"\nException Type: {result.get('error_type', 'Unknown')}")
-        lines.append(f"Error Message: {result['error']}")
-        lines.append("\nFull Traceback:")
-        lines.append(result["traceback"].rstrip())
+        lines += (
+            f"\nException Type: {result.get('error_type', 'Unknown')}",
+            f"Error Message: {result['error']}",
+        )
+        if "traceback" in result:
+            lines += ("\nFull Traceback:", result["traceback"].rstrip())
 
-    lines.append(f"\n{'='*60}")
+    lines.append("\n" + RESULT_SEPARATOR)
 
     return "\n".join(lines)
 
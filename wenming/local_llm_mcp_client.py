@@ -30,19 +30,57 @@ class LocalLLMWithMCP:
     def __init__(self, model_name: str = "llama3.1:8b"):
         self.model_name = model_name
         self.mcp_session = None
-        self.available_tools = []
+        self._available_tools = []
+        self._llm_tools = None  # Converted tool definitions, built on first use
         self.conversation_history = []
+        # Only the most recent user turns are sent to the LLM, bounding prompt size
+        self.max_history_turns = 20
         self.server_params = None
+        # Async client so LLM requests don't block the event loop
+        self.llm_client = ollama.AsyncClient() if HAS_OLLAMA else None
+
+    @property
+    def available_tools(self):
+        """MCP tool definitions discovered from the server"""
+        return self._available_tools
+
+    @available_tools.setter
+    def available_tools(self, tools):
+        self._available_tools = tools
+        # New tool list, so the LLM format has to be rebuilt
+        self._llm_tools = None
 
     def setup_server_params(self, server_params: StdioServerParameters):
         """Store server parameters for connection"""
         self.server_params = server_params
 
+    def _trim_history(self):
+        """
+        Drop the oldest turns so at most max_history_turns user turns remain
+        Leading system messages are pinned, and a turn is removed whole so tool
+        results never lose the assistant message that requested them
+        """
+        history = self.conversation_history
+
+        n_pinned = 0
+        while n_pinned < len(history) and history[n_pinned]["role"] == "system":
+            n_pinned += 1
+
+        user_turns = [
+            i for i in range(n_pinned, len(history)) if history[i]["role"] == "user"
+        ]
+        if len(user_turns) > self.max_history_turns:
+            del history[n_pinned:user_turns[-self.max_history_turns]]
+
     def convert_mcp_tools_to_llm_format(self) -> list[dict[str, Any]]:
         """
         Convert MCP tool definitions to the format your LLM expects
         Different LLMs have different formats for function calling
+        The result is reused until available_tools is reassigned
         """
+        if self._llm_tools is not None:
+            return self._llm_tools
+
         llm_tools = []
 
         for tool in self.available_tools:
@@ -57,6 +95,7 @@ class LocalLLMWithMCP:
             }
             llm_tools.append(llm_tool)
 
+        self._llm_tools = llm_tools
         return llm_tools
 
     async def chat(self, session: ClientSession, user_message: str) -> str:
@@ -72,6 +111,7 @@ class LocalLLMWithMCP:
             "role": "user",
             "content": user_message
         })
+        self._trim_history()
 
         # Convert MCP tools to LLM format
         tools = self.convert_mcp_tools_to_llm_format()
@@ -83,7 +123,7 @@ class LocalLLMWithMCP:
         print(f"[LLM] Thinking... (using {self.model_name})")
 
         # First LLM call - let it decide if it needs to use tools
-        response = ollama.chat(
+        response = await self.llm_client.chat(
             model=self.model_name,
             messages=self.conversation_history,
             tools=tools
@@ -93,21 +133,27 @@ class LocalLLMWithMCP:
         if response.get('message', {}).get('tool_calls'):
             print("[LLM] Decided to use tools")
 
-            tool_results = []
+            calls = []
 
-            # Execute each tool call
+            # Start every tool call on the MCP server, then wait for them together
             for tool_call in response['message']['tool_calls']:
                 tool_name = tool_call['function']['name']
                 tool_args = tool_call['function']['arguments']
 
-                # Call MCP server
                 print(f"\n[CLIENT] Calling MCP tool: {tool_name}")
                 print(f"[CLIENT] Arguments: {tool_args}")
 
-                result = await session.call_tool(tool_name, arguments=tool_args)
+                calls.append(session.call_tool(tool_name, arguments=tool_args))
+
+            results = await asyncio.gather(*calls, return_exceptions=True)
+
+            tool_results = []
 
-                # Extract text content from result
-                if result.content and len(result.content) > 0:
+            for result in results:
+                # Extract text content from result; a failed call is reported to the LLM
+                if isinstance(result, BaseException):
+                    tool_result = f"Error: {result}"
+                elif result.content and len(result.content) > 0:
                     tool_result = result.content[0].text
                 else:
                     tool_result = str(result)
@@ -127,7 +173,7 @@ class LocalLLMWithMCP:
 
             # Call LLM again with tool results to generate final response
             print("[LLM] Generating final response with tool results...")
-            final_response = ollama.chat(
+            final_response = await self.llm_client.chat(
                 model=self.model_name,
                 messages=self.conversation_history
             )
@@ -190,7 +236,6 @@ async def demo_with_local_llm():
                 for query in test_queries:
                     response = await client.chat(session, query)
                     print("\n" + "-"*60)
-                    await asyncio.sleep(1)  # Small delay between queries
 
     except Exception as e:
         print(f"Error: {e}")
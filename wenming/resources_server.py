@@ -5,6 +5,8 @@ This server exposes team documentation as MCP Resources
 """
 
 import asyncio
+from bisect import bisect_right
+from itertools import accumulate
 from pathlib import Path
 from mcp.server.fastmcp import FastMCP
 
@@ -17,113 +19,84 @@ REPO_ROOT = Path(__file__).parent.parent.resolve()
 GUIDELINES_PATH = REPO_ROOT / "projects" / "unit3" / "team-guidelines"
 TEMPLATES_PATH = REPO_ROOT / "projects" / "unit3" / "templates"
 
-# Resource 1: PR Guidelines
-@mcp.resource("guidelines://pr-guidelines")
-async def get_pr_guidelines() -> str:
-    """
-    Get the Pull Request guidelines for the team.
-    Contains rules for PR size, description, review process, and more.
-    """
-    file_path = GUIDELINES_PATH / "pr-guidelines.md"
-    if file_path.exists():
-        return file_path.read_text(encoding="utf-8")
-    return "PR Guidelines file not found"
-
-# Resource 2: Coding Standards
-@mcp.resource("guidelines://coding-standards")
-async def get_coding_standards() -> str:
-    """
-    Get the team's coding standards.
-    Includes Python style guide, Git commit conventions, testing requirements.
-    """
-    file_path = GUIDELINES_PATH / "coding-standards.md"
-    if file_path.exists():
-        return file_path.read_text(encoding="utf-8")
-    return "Coding Standards file not found"
-
-# Resource 3: Bug Report Template
-@mcp.resource("templates://bug-report")
-async def get_bug_template() -> str:
-    """
-    Get the bug report template.
-    Standard format for reporting issues.
-    """
-    file_path = TEMPLATES_PATH / "bug.md"
-    if file_path.exists():
-        return file_path.read_text(encoding="utf-8")
-    return "Bug template file not found"
-
-# Resource 4: Feature Request Template
-@mcp.resource("templates://feature-request")
-async def get_feature_template() -> str:
-    """
-    Get the feature request template.
-    Standard format for proposing new features.
-    """
-    file_path = TEMPLATES_PATH / "feature.md"
-    if file_path.exists():
-        return file_path.read_text(encoding="utf-8")
-    return "Feature template file not found"
-
-# Resource 5: Documentation Template
-@mcp.resource("templates://documentation")
-async def get_docs_template() -> str:
-    """
-    Get the documentation template.
-    Standard format for creating documentation.
-    """
-    file_path = TEMPLATES_PATH / "docs.md"
-    if file_path.exists():
-        return file_path.read_text(encoding="utf-8")
-    return "Documentation template file not found"
-
-# Resource 6: Performance Issue Template
-@mcp.resource("templates://performance")
-async def get_performance_template() -> str:
-    """
-    Get the performance issue template.
-    Standard format for reporting performance problems.
-    """
-    file_path = TEMPLATES_PATH / "performance.md"
-    if file_path.exists():
-        return file_path.read_text(encoding="utf-8")
-    return "Performance template file not found"
-
-# Resource 7: Security Issue Template
-@mcp.resource("templates://security")
-async def get_security_template() -> str:
-    """
-    Get the security issue template.
-    Standard format for reporting security vulnerabilities.
-    """
-    file_path = TEMPLATES_PATH / "security.md"
-    if file_path.exists():
-        return file_path.read_text(encoding="utf-8")
-    return "Security template file not found"
-
-# Resource 8: Test Template
-@mcp.resource("templates://test")
-async def get_test_template() -> str:
-    """
-    Get the test template.
-    Standard format for test planning and documentation.
-    """
-    file_path = TEMPLATES_PATH / "test.md"
-    if file_path.exists():
-        return file_path.read_text(encoding="utf-8")
-    return "Test template file not found"
-
-# Resource 9: Refactoring Template
-@mcp.resource("templates://refactor")
-async def get_refactor_template() -> str:
-    """
-    Get the refactoring template.
-    Standard format for proposing code refactoring.
-    """
-    file_path = TEMPLATES_PATH / "refactor.md"
-    if file_path.exists():
-        return file_path.read_text(encoding="utf-8")
-    return "Refactor template file not found"
+# The documentation set is fixed while the server runs, so list it once at startup
+GUIDELINE_FILES = list(GUIDELINES_PATH.glob("*.md"))
+TEMPLATE_FILES = list(TEMPLATES_PATH.glob("*.md"))
+
+
+def _build_search_index() -> list:
+    """Read every guideline and template once into (stem, line_no, line, line_lower) rows"""
+    index = []
+    for file in GUIDELINE_FILES + TEMPLATE_FILES:
+        content = file.read_text(encoding="utf-8")
+        for i, line in enumerate(content.split("\n"), 1):
+            index.append((file.stem, i, line.strip(), line.lower()))
+    return index
+
+
+SEARCH_INDEX = _build_search_index()
+
+# All lowercased lines joined into one string, plus the offset where each line starts,
+# so a search is a single str.find scan instead of a Python loop over lines
+SEARCH_CORPUS = "\n".join(row[3] for row in SEARCH_INDEX)
+LINE_STARTS = list(accumulate((len(row[3]) + 1 for row in SEARCH_INDEX[:-1]), initial=0))
+
+# File-backed resources: URI -> (handler name, file, label for "not found", description)
+RESOURCE_FILES = {
+    "guidelines://pr-guidelines": (
+        "get_pr_guidelines", GUIDELINES_PATH / "pr-guidelines.md", "PR Guidelines",
+        "Get the Pull Request guidelines for the team. "
+        "Contains rules for PR size, description, review process, and more.",
+    ),
+    "guidelines://coding-standards": (
+        "get_coding_standards", GUIDELINES_PATH / "coding-standards.md", "Coding Standards",
+        "Get the team's coding standards. "
+        "Includes Python style guide, Git commit conventions, testing requirements.",
+    ),
+    "templates://bug-report": (
+        "get_bug_template", TEMPLATES_PATH / "bug.md", "Bug template",
+        "Get the bug report template. Standard format for reporting issues.",
+    ),
+    "templates://feature-request": (
+        "get_feature_template", TEMPLATES_PATH / "feature.md", "Feature template",
+        "Get the feature request template. Standard format for proposing new features.",
+    ),
+    "templates://documentation": (
+        "get_docs_template", TEMPLATES_PATH / "docs.md", "Documentation template",
+        "Get the documentation template. Standard format for creating documentation.",
+    ),
+    "templates://performance": (
+        "get_performance_template", TEMPLATES_PATH / "performance.md", "Performance template",
+        "Get the performance issue template. Standard format for reporting performance problems.",
+    ),
+    "templates://security": (
+        "get_security_template", TEMPLATES_PATH / "security.md", "Security template",
+        "Get the security issue template. Standard format for reporting security vulnerabilities.",
+    ),
+    "templates://test": (
+        "get_test_template", TEMPLATES_PATH / "test.md", "Test template",
+        "Get the test template. Standard format for test planning and documentation.",
+    ),
+    "templates://refactor": (
+        "get_refactor_template", TEMPLATES_PATH / "refactor.md", "Refactor template",
+        "Get the refactoring template. Standard format for proposing code refactoring.",
+    ),
+}
+
+
+def _register_file_resource(uri: str, name: str, file_path: Path, label: str, description: str):
+    """Register one concrete resource that serves the contents of file_path"""
+    async def read_file() -> str:
+        if file_path.exists():
+            return await asyncio.to_thread(file_path.read_text, encoding="utf-8")
+        return f"{label} file not found"
+
+    mcp.resource(uri, name=name, description=description)(read_file)
+
+
+# Registered one by one (not as a URI template) so they all still appear in resources/list
+for uri, (name, file_path, label, description) in RESOURCE_FILES.items():
+    _register_file_resource(uri, name, file_path, label, description)
 
 # Dynamic Resource: List all available guidelines
 @mcp.resource("guidelines://list")
@@ -136,12 +109,12 @@ async def list_all_guidelines() -> str:
 
     # List guidelines
     guidelines.append("## Team Guidelines\n")
-    for file in GUIDELINES_PATH.glob("*.md"):
+    for file in GUIDELINE_FILES:
         guidelines.append(f"- {file.stem}: guidelines://{file.stem}")
 
     # List templates
     guidelines.append("\n## Templates\n")
-    for file in TEMPLATES_PATH.glob("*.md"):
+    for file in TEMPLATE_FILES:
         guidelines.append(f"- {file.stem}: templates://{file.stem}")
 
     return "\n".join(guidelines)
@@ -161,21 +134,19 @@ async def search_guidelines(keyword: str) -> str:
     results = []
     keyword_lower = keyword.lower()
 
-    # Search in guidelines
-    for file in GUIDELINES_PATH.glob("*.md"):
-        content = file.read_text(encoding="utf-8")
-        lines = content.split("\n")
-        for i, line in enumerate(lines, 1):
-            if keyword_lower in line.lower():
-                results.append(f"[{file.stem}:{i}] {line.strip()}")
-
-    # Search in templates
-    for file in TEMPLATES_PATH.glob("*.md"):
-        content = file.read_text(encoding="utf-8")
-        lines = content.split("\n")
-        for i, line in enumerate(lines, 1):
-            if keyword_lower in line.lower():
-                results.append(f"[{file.stem}:{i}] {line.strip()}")
+    # Lines never contain a newline, so a keyword with one cannot match
+    if SEARCH_INDEX and "\n" not in keyword_lower:
+        last_row = len(SEARCH_INDEX) - 1
+        pos = SEARCH_CORPUS.find(keyword_lower)
+        while pos != -1:
+            # Map the hit back to its line, then resume at the next line so each
+            # matching line is reported once; guidelines come first, then templates
+            row = bisect_right(LINE_STARTS, pos) - 1
+            stem, i, line, _ = SEARCH_INDEX[row]
+            results.append(f"[{stem}:{i}] {line}")
+            if row == last_row:
+                break
+            pos = SEARCH_CORPUS.find(keyword_lower, LINE_STARTS[row + 1])
 
     if results:
         return f"Found {len(results)} matches for '{keyword}':\n\n" + "\n".join(results[:20])